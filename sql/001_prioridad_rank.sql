@@ -0,0 +1,13 @@
+-- Columna generada con el orden numérico de prioridad.
+--
+-- ORDER BY CASE prioridad WHEN 'alta' THEN 1 ... END no es indexable y fuerza
+-- un filesort. Con la columna generada + índice compuesto, MySQL puede servir
+-- los listados ya ordenados desde el índice (y filtrar por estado con el
+-- prefijo del índice).
+
+ALTER TABLE incidencias
+    ADD COLUMN prioridad_rank TINYINT
+        AS (FIELD(prioridad, 'alta', 'media', 'baja')) STORED;
+
+CREATE INDEX ix_inc_estado_prioridad_fecha
+    ON incidencias (estado, prioridad_rank, fecha_apertura);
@@ -0,0 +1,11 @@
+-- Índice compuesto para listar_incidencias_sin_tecnico:
+--   WHERE tecnico_id IS NULL AND estado != 'cerrada' ORDER BY fecha_apertura
+--
+-- Sin índice la consulta recorre la tabla entera. Con (tecnico_id, estado,
+-- fecha_apertura) el filtro usa el prefijo del índice y el ORDER BY sale en
+-- orden de índice. MySQL no tiene INCLUDE, pero los índices secundarios de
+-- InnoDB llevan implícita la clave primaria (id), con lo que queda cubierto
+-- gran parte del acceso por fila.
+
+CREATE INDEX ix_inc_sin_tecnico
+    ON incidencias (tecnico_id, estado, fecha_apertura);
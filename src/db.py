@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import logging
 import os
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Iterable, Optional
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Optional
+from weakref import WeakKeyDictionary
 
 import mysql.connector
 from mysql.connector.connection import MySQLConnection
+from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
 
 from dotenv import load_dotenv
-load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# load_dotenv() se difiere a la primera lectura de configuración: cargarlo en
+# el import pagaba un stat+parse de .env en cada proceso que importa el módulo.
+_dotenv_loaded = False
 
 
 @dataclass(frozen=True)
@@ -21,10 +33,16 @@ class DBConfig:
     password: str
 
 
+@lru_cache(maxsize=1)
 def load_config_from_env() -> DBConfig:
     """
     Lee la configuración de conexión desde variables de entorno.
 
+    El resultado se memoiza (lru_cache): los os.getenv solo se pagan en la
+    primera llamada y, al devolver siempre el mismo DBConfig, la búsqueda del
+    pool en _get_pool se resuelve por identidad. Cambios en el entorno tras
+    la primera llamada se ignoran.
+
     Variables esperadas (con valores por defecto):
     - DB_HOST (default: localhost)
     - DB_PORT (default: 3306)
@@ -37,6 +55,10 @@ def load_config_from_env() -> DBConfig:
     Recomendación:
     - Validar que DB_PORT sea un número entero.
     """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv(override=False)
+        _dotenv_loaded = True
     try:
         port = int(os.getenv("DB_PORT", "3306"))
         return DBConfig(
@@ -52,82 +74,300 @@ def load_config_from_env() -> DBConfig:
     
 
 
-def get_connection(cfg: Optional[DBConfig] = None) -> MySQLConnection:
+_pools: dict[DBConfig, MySQLConnectionPool] = {}
+
+
+def _get_pool(cfg: DBConfig) -> MySQLConnectionPool:
     """
-    Crea y devuelve una conexión MySQL/MariaDB.
+    Devuelve el pool de conexiones asociado a cfg, creándolo perezosamente
+    la primera vez que se pide.
 
-    - Si cfg es None, debe llamar a load_config_from_env().
-    - Debe usar mysql.connector.connect(...) con los parámetros de cfg.
+    El tamaño del pool se controla con la variable de entorno DB_POOL_SIZE
+    (default: 5).
     """
-    if cfg is None:
-        cfg = load_config_from_env()
-    
-    try:
-        conn = mysql.connector.connect(
+    pool = _pools.get(cfg)
+    if pool is None:
+        kwargs = dict(
+            pool_name="sti",
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            pool_reset_session=True,
+            # Con autocommit los SELECT no abren transacciones implícitas que
+            # haya que cerrar con COMMIT/ROLLBACK: un round-trip menos por
+            # consulta. Para atomicidad multi-sentencia está transaction().
+            autocommit=True,
             host=cfg.host,
             port=cfg.port,
             database=cfg.database,
             user=cfg.user,
-            password=cfg.password
+            password=cfg.password,
         )
-        logger.info(f"Conexión establecida a {cfg.host}:{cfg.port}/{cfg.database}")
+        try:
+            # use_pure=False usa la extensión C del driver, que decodifica
+            # los paquetes de resultados en C en lugar de en Python puro.
+            pool = MySQLConnectionPool(use_pure=False, **kwargs)
+        except ImportError:
+            # Extensión C no disponible en esta instalación.
+            pool = MySQLConnectionPool(use_pure=True, **kwargs)
+        _pools[cfg] = pool
+    return pool
+
+
+def get_connection(cfg: Optional[DBConfig] = None) -> PooledMySQLConnection:
+    """
+    Devuelve una conexión MySQL/MariaDB sacada del pool.
+
+    - Si cfg es None, debe llamar a load_config_from_env().
+    - Abrir una conexión nueva paga TCP + handshake + autenticación en cada
+      llamada; el pool las reutiliza y evita ese coste.
+    - El llamador debe hacer conn.close() al terminar: con una conexión de
+      pool eso NO cierra el socket, sino que devuelve la conexión al pool.
+    """
+    if cfg is None:
+        cfg = load_config_from_env()
+
+    try:
+        conn = _get_pool(cfg).get_connection()
+        logger.info("Conexión obtenida del pool para %s:%d/%s", cfg.host, cfg.port, cfg.database)
         return conn
     except mysql.connector.Error as e:
-        logger.error(f"Error al conectar a la base de datos: {e}")
+        logger.error("Error al conectar a la base de datos: %s", e)
         raise
-   
+
+
+
+# Máximo de cursores preparados cacheados por conexión (LRU).
+_PREPARED_CACHE_SIZE = 64
+
+# conexión -> OrderedDict[(sql, dictionary), cursor preparado]
+# WeakKeyDictionary: las entradas desaparecen solas cuando la conexión muere.
+_prepared_cursors: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def _prepared_cursor(conn: MySQLConnection, query: str, dictionary: bool = False):
+    """
+    Devuelve un cursor preparado (prepared=True) para query, reutilizando el
+    de llamadas anteriores sobre la misma conexión.
+
+    Preparar una vez y re-ejecutar evita que el servidor re-parsee el SQL en
+    cada llamada y reduce el paquete de red a solo los parámetros. El cursor
+    cacheado NO debe cerrarse tras cada uso; se cierra al expulsarlo del LRU
+    o al morir la conexión.
+    """
+    cache = _prepared_cursors.get(conn)
+    if cache is None:
+        cache = OrderedDict()
+        _prepared_cursors[conn] = cache
+
+    key = (query, dictionary)
+    cur = cache.get(key)
+    if cur is None:
+        if dictionary:
+            cur = conn.cursor(prepared=True, dictionary=True)
+        else:
+            cur = conn.cursor(prepared=True)
+        if len(cache) >= _PREPARED_CACHE_SIZE:
+            _, viejo = cache.popitem(last=False)
+            viejo.close()
+        cache[key] = cur
+    else:
+        cache.move_to_end(key)
+    return cur
 
 
 def fetch_all(conn: MySQLConnection, query: str, params: Optional[Iterable[Any]] = None) -> list[dict]:
     """
     Ejecuta una consulta SELECT y devuelve una lista de diccionarios (una fila -> un dict).
 
-    Pistas:
-    - Crear un cursor con conn.cursor(dictionary=True)
-    - Ejecutar cur.execute(query, params o ())
-    - Obtener filas con cur.fetchall()
-    - Cerrar el cursor siempre (try/finally)
+    Usa un cursor preparado cacheado por (conexión, SQL): la misma consulta
+    repetida solo envía los parámetros en binario, sin re-parseo del SQL.
     """
-    cursor = None
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query, params or ())
+        cursor = _prepared_cursor(conn, query, dictionary=True)
+        if params is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, params)
         results = cursor.fetchall()
-        logger.debug(f"Consulta ejecutada: {query}, filas obtenidas: {len(results)}")
+        logger.debug("Consulta ejecutada: %s, filas obtenidas: %d", query, len(results))
         return results
     except mysql.connector.Error as e:
-        logger.error(f"Error en la consulta SELECT: {e}")
+        logger.error("Error en la consulta SELECT: %s", e)
+        raise
+
+
+
+_HAS_LIMIT = re.compile(r"\blimit\b", re.I)
+
+
+def fetch_one(conn: MySQLConnection, query: str, params: Optional[Iterable[Any]] = None) -> Optional[dict]:
+    """
+    Ejecuta una consulta SELECT y devuelve la primera fila como dict, o None
+    si no hay resultados.
+
+    Si la consulta no lleva LIMIT se le añade LIMIT 1, de forma que el
+    servidor solo serializa y envía una fila aunque coincidan más: para
+    búsquedas de existencia/por id evita la lista completa que construiría
+    fetch_all.
+    """
+    if not _HAS_LIMIT.search(query):
+        query = query + " LIMIT 1"
+    try:
+        cursor = _prepared_cursor(conn, query, dictionary=True)
+        if params is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, params)
+        row = cursor.fetchone()
+        cursor.fetchall()  # drena el resto por si la consulta traía su propio LIMIT
+        logger.debug("Consulta ejecutada: %s, fila encontrada: %s", query, row is not None)
+        return row
+    except mysql.connector.Error as e:
+        logger.error("Error en la consulta SELECT: %s", e)
+        raise
+
+
+def fetch_all_as(conn: MySQLConnection, query: str, params: Optional[Iterable[Any]], row_cls: type) -> list[Any]:
+    """
+    Ejecuta una consulta SELECT y devuelve una lista de instancias de row_cls,
+    construidas posicionalmente con row_cls(*fila).
+
+    Pensado para dataclasses con slots=True: frente al dict-por-fila de
+    fetch_all, evita alocar un dict y hashear los nombres de columna en cada
+    fila, con menos memoria y menos CPU por fila devuelta. El orden de los
+    campos de row_cls debe coincidir con el de las columnas del SELECT.
+    """
+    try:
+        cursor = _prepared_cursor(conn, query)
+        if params is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, params)
+        results = [row_cls(*fila) for fila in cursor.fetchall()]
+        logger.debug("Consulta ejecutada: %s, filas obtenidas: %d", query, len(results))
+        return results
+    except mysql.connector.Error as e:
+        logger.error("Error en la consulta SELECT: %s", e)
+        raise
+
+
+@contextmanager
+def fetch_iter(conn: MySQLConnection, query: str, params: Optional[Iterable[Any]] = None) -> Iterator[Iterator[dict]]:
+    """
+    Ejecuta una consulta SELECT y produce las filas de una en una, sin
+    materializar el resultado completo en memoria como hace fetch_all.
+
+    Usa un cursor sin buffer (buffered=False): las filas se van leyendo del
+    socket a medida que se consumen, lo que mantiene memoria O(1) y solapa
+    la transferencia de red con el procesado en Python.
+
+    Uso:
+        with fetch_iter(conn, sql) as filas:
+            for fila in filas:
+                ...
+
+    El cursor se cierra automáticamente al salir del with; no consumir el
+    iterador fuera del bloque.
+    """
+    try:
+        with conn.cursor(dictionary=True, buffered=False) as cursor:
+            if params is None:
+                cursor.execute(query)
+            else:
+                cursor.execute(query, params)
+            try:
+                yield iter(cursor)
+            finally:
+                # Drena las filas no leídas antes de que el with cierre el
+                # cursor: un cursor sin buffer con resultados pendientes
+                # lanza InternalError("Unread result found") en close(), lo
+                # que rompería la salida temprana del bucle y enmascararía
+                # la excepción original del bloque del consumidor.
+                try:
+                    cursor.fetchall()
+                except mysql.connector.InterfaceError:
+                    pass
+    except mysql.connector.Error as e:
+        logger.error("Error en la consulta SELECT: %s", e)
         raise
-    finally:
-        if cursor:
-            cursor.close()
-    
 
 
 def execute(conn: MySQLConnection, query: str, params: Optional[Iterable[Any]] = None) -> int:
     """
     Ejecuta una sentencia INSERT/UPDATE/DELETE y devuelve el número de filas afectadas.
 
-    Pistas:
-    - Crear un cursor normal conn.cursor()
-    - Ejecutar cur.execute(query, params o ())
-    - Hacer conn.commit()
-    - Devolver cur.rowcount
-    - Cerrar el cursor siempre (try/finally)
+    Usa un cursor preparado cacheado por (conexión, SQL): los INSERT/UPDATE
+    calientes se re-ejecutan sin re-parseo del SQL en el servidor.
+
+    params debería ser una tupla (no una lista): el driver tiene un camino
+    rápido para tuplas al serializar los parámetros.
     """
-    cursor = None
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, params or ())
-        conn.commit()
+        cursor = _prepared_cursor(conn, query)
+        if params is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, params)
+        if not conn.autocommit and not getattr(conn, "_in_transaction_block", False):
+            conn.commit()
         affected_rows = cursor.rowcount
-        logger.debug(f"Sentencia ejecutada: {query}, filas afectadas: {affected_rows}")
+        logger.debug("Sentencia ejecutada: %s, filas afectadas: %d", query, affected_rows)
         return affected_rows
     except mysql.connector.Error as e:
-        logger.error(f"Error en la sentencia de modificación: {e}")
+        logger.error("Error en la sentencia de modificación: %s", e)
+        conn.rollback()
+        raise
+
+
+@contextmanager
+def transaction(conn: MySQLConnection) -> Iterator[MySQLConnection]:
+    """
+    Agrupa varias sentencias en una transacción atómica.
+
+    Las conexiones del pool llegan con autocommit=True; este context manager
+    abre una transacción explícita con START TRANSACTION, hace commit al
+    salir y rollback si se lanza una excepción. Mientras el bloque está
+    activo, execute y execute_many no confirman por sentencia.
+
+    Usa start_transaction()/commit()/rollback() y no asigna conn.autocommit:
+    PooledMySQLConnection delega las llamadas a métodos en la conexión real,
+    pero asignar un atributo solo crearía una sombra en el wrapper sin tocar
+    la sesión del servidor.
+
+    Uso:
+        with transaction(conn):
+            execute(conn, ...)
+            execute(conn, ...)
+    """
+    conn.start_transaction()
+    conn._in_transaction_block = True
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
         conn.rollback()
         raise
     finally:
-        if cursor:
-            cursor.close()
-    raise NotImplementedError
+        conn._in_transaction_block = False
+
+
+def execute_many(conn: MySQLConnection, query: str, seq_of_params: Iterable[Iterable[Any]]) -> int:
+    """
+    Ejecuta una sentencia INSERT/UPDATE/DELETE una vez por cada tupla de
+    parámetros y devuelve el total de filas afectadas.
+
+    Usa cursor.executemany(), que para INSERTs reescribe los VALUES en una
+    única sentencia multi-fila: N filas viajan en un solo round-trip y un
+    solo commit, en lugar de N llamadas a execute().
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.executemany(query, list(seq_of_params))
+            if not conn.autocommit and not getattr(conn, "_in_transaction_block", False):
+                conn.commit()
+            affected_rows = cursor.rowcount
+            logger.debug("Sentencia por lotes ejecutada: %s, filas afectadas: %d", query, affected_rows)
+            return affected_rows
+    except mysql.connector.Error as e:
+        logger.error("Error en la sentencia por lotes: %s", e)
+        conn.rollback()
+        raise
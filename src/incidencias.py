@@ -1,34 +1,136 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+
 from mysql.connector.connection import MySQLConnection
 
-from .db import execute, fetch_all
+from .db import execute, execute_many, fetch_all, fetch_all_as
+
+# Máximo de ids por UPDATE en las funciones bulk, para no acercarse a
+# max_allowed_packet con listas muy largas.
+_TAM_LOTE = 500
+
+# Precalculados a nivel de módulo: evita reconstruir la lista y el mensaje
+# en cada validación (relevante cuando crear_incidencias_bulk valida miles
+# de filas).
+_PRIORIDADES = frozenset(("baja", "media", "alta"))
+_PRIORIDADES_ERR = "prioridad debe ser una de: baja, media, alta"
+
+
+def _sql(texto: str) -> str:
+    """Colapsa sangría y saltos de línea de un literal SQL multilínea."""
+    return " ".join(texto.split())
+
+
+# SQL precompilado a constantes de módulo: el literal se normaliza una sola
+# vez en el import (sin sangría ni saltos de línea, menos bytes por paquete)
+# y su identidad estable favorece la caché de cursores preparados de db.
+_SQL_LISTAR_ACTIVAS = _sql("""
+    SELECT id, equipo_id, tecnico_id, descripcion, prioridad, estado,
+           fecha_apertura, fecha_cierre
+    FROM incidencias
+    WHERE estado != 'cerrada'
+    ORDER BY prioridad_rank, fecha_apertura ASC
+""")
+
+_SQL_LISTAR_SIN_TECNICO = _sql("""
+    SELECT id, equipo_id, tecnico_id, descripcion, prioridad, estado,
+           fecha_apertura, fecha_cierre
+    FROM incidencias
+    WHERE tecnico_id IS NULL AND estado != 'cerrada'
+    ORDER BY fecha_apertura ASC
+""")
+
+_SQL_INSERT_INCIDENCIA = _sql("""
+    INSERT INTO incidencias
+    (equipo_id, descripcion, prioridad, tecnico_id, estado, fecha_apertura, fecha_cierre)
+    VALUES (%s, %s, %s, NULL, 'abierta', NOW(), NULL)
+""")
+
+_SQL_ASIGNAR_TECNICO = _sql("""
+    UPDATE incidencias
+    SET tecnico_id = %s, estado = 'en_proceso'
+    WHERE id = %s AND estado != 'cerrada'
+""")
+
+_SQL_CERRAR_INCIDENCIA = _sql("""
+    UPDATE incidencias
+    SET estado = 'cerrada', fecha_cierre = NOW()
+    WHERE id = %s AND estado != 'cerrada'
+""")
+
+_SQL_DETALLE_JOIN = _sql("""
+    SELECT
+        i.id, i.descripcion, i.prioridad, i.estado,
+        i.fecha_apertura, i.fecha_cierre,
+        e.tipo, e.modelo, e.ubicacion, e.estado AS estado_equipo,
+        t.nombre AS tecnico
+    FROM incidencias i
+    JOIN equipos e ON i.equipo_id = e.id
+    LEFT JOIN tecnicos t ON i.tecnico_id = t.id
+    ORDER BY i.estado, i.prioridad_rank, i.fecha_apertura ASC
+""")
 
+# Plantillas de los UPDATE por lotes (el número de marcas depende del lote).
+_SQL_CERRAR_BULK_TPL = (
+    "UPDATE incidencias SET estado = 'cerrada', fecha_cierre = NOW() "
+    "WHERE estado != 'cerrada' AND id IN ({marcas})"
+)
+_SQL_ASIGNAR_BULK_TPL = (
+    "UPDATE incidencias SET tecnico_id = CASE id {casos} END, estado = 'en_proceso' "
+    "WHERE id IN ({marcas}) AND estado != 'cerrada'"
+)
 
-def listar_incidencias_activas(conn: MySQLConnection) -> list[dict]:
+
+@dataclass(slots=True)
+class Incidencia:
+    """Fila de incidencias con atributos fijos: más ligera que un dict por fila."""
+    id: int
+    equipo_id: int
+    tecnico_id: int | None
+    descripcion: str
+    prioridad: str
+    estado: str
+    fecha_apertura: datetime
+    fecha_cierre: datetime | None
+
+
+@dataclass(slots=True)
+class IncidenciaDetalle:
+    """Fila de la vista JOIN de incidencias con equipo y técnico."""
+    id: int
+    descripcion: str
+    prioridad: str
+    estado: str
+    fecha_apertura: datetime
+    fecha_cierre: datetime | None
+    tipo: str
+    modelo: str
+    ubicacion: str
+    estado_equipo: str
+    tecnico: str | None
+
+
+def listar_incidencias_activas(conn: MySQLConnection) -> list[Incidencia]:
     """
     Devuelve incidencias cuyo estado NO sea 'cerrada'.
 
     Requisitos:
-    - Debe devolver una lista de diccionarios (una fila por dict).
+    - Debe devolver una lista de Incidencia (dataclass con slots: evita el
+      dict por fila y el hasheo de nombres de columna de fetch_all).
     - Debe ordenar primero por prioridad (alta > media > baja) y luego por fecha_apertura ascendente.
     - Debe usar fetch_all(conn, sql, params) para ejecutar el SELECT.
 
-    Pista: se puede ordenar por prioridad usando CASE en SQL.
-    """
-    sql = """
-        SELECT *
-        FROM incidencias
-        WHERE estado != 'cerrada'
-        ORDER BY 
-            CASE prioridad
-                WHEN 'alta' THEN 1
-                WHEN 'media' THEN 2
-                WHEN 'baja' THEN 3
-            END,
-            fecha_apertura ASC
+    Proyecta columnas explícitas en lugar de SELECT *: cada columna no usada
+    se serializa en el servidor, viaja por el socket y acaba como entrada de
+    dict por fila; enumerarlas evita ese coste y aísla de cambios de esquema.
+
+    Ordena por prioridad_rank (columna generada, ver sql/001_prioridad_rank.sql):
+    a diferencia del CASE prioridad WHEN ..., es indexable y evita el filesort.
     """
-    return fetch_all(conn, sql)
+    return fetch_all_as(conn, _SQL_LISTAR_ACTIVAS, None, Incidencia)
 
 
 def listar_incidencias_sin_tecnico(conn: MySQLConnection) -> list[dict]:
@@ -40,13 +142,7 @@ def listar_incidencias_sin_tecnico(conn: MySQLConnection) -> list[dict]:
     - estado <> 'cerrada'
     - ordenar por fecha_apertura ascendente
     """
-    sql = """
-        SELECT *
-        FROM incidencias
-        WHERE tecnico_id IS NULL AND estado != 'cerrada'
-        ORDER BY fecha_apertura ASC
-    """
-    return fetch_all(conn, sql)
+    return fetch_all(conn, _SQL_LISTAR_SIN_TECNICO)
 
 
 def crear_incidencia(conn: MySQLConnection, equipo_id: int, descripcion: str, prioridad: str = "media") -> int:
@@ -67,22 +163,42 @@ def crear_incidencia(conn: MySQLConnection, equipo_id: int, descripcion: str, pr
 
     Debe devolver el número de filas afectadas (normalmente 1).
     """
+    return execute(conn, _SQL_INSERT_INCIDENCIA,
+                   _validar_nueva_incidencia(equipo_id, descripcion, prioridad))
+
+
+def _validar_nueva_incidencia(equipo_id: int, descripcion: str, prioridad: str) -> tuple[int, str, str]:
+    """Valida los datos de una incidencia nueva y devuelve la tupla de parámetros SQL."""
     if not isinstance(equipo_id, int) or equipo_id <= 0:
         raise ValueError("equipo_id debe ser un entero positivo")
-    
-    if not descripcion or not descripcion.strip():
+
+    descripcion = descripcion.strip() if descripcion else ""
+    if not descripcion:
         raise ValueError("La descripción no puede estar vacía")
-    
-    prioridades_validas = ['baja', 'media', 'alta']
-    if prioridad not in prioridades_validas:
-        raise ValueError(f"prioridad debe ser una de: {', '.join(prioridades_validas)}")
-    sql = """
-        INSERT INTO incidencias 
-        (equipo_id, descripcion, prioridad, tecnico_id, estado, fecha_apertura, fecha_cierre)
-        VALUES (%s, %s, %s, NULL, 'abierta', NOW(), NULL)
-    """
-    return execute(conn, sql, (equipo_id, descripcion.strip(), prioridad))
-    
+
+    if prioridad not in _PRIORIDADES:
+        raise ValueError(_PRIORIDADES_ERR)
+    return (equipo_id, descripcion, prioridad)
+
+
+def crear_incidencias_bulk(conn: MySQLConnection, items: list[tuple[int, str, str]]) -> int:
+    """
+    Crea varias incidencias en estado 'abierta' con un único round-trip.
+
+    - items: lista de tuplas (equipo_id, descripcion, prioridad).
+    - Aplica las mismas validaciones que crear_incidencia a cada tupla
+      (lanza ValueError en la primera fila inválida, sin insertar nada).
+    - Usa execute_many: N filas viajan en un solo INSERT multi-fila con un
+      solo commit, en lugar de N inserts con N round-trips.
+
+    Devuelve el número de filas insertadas.
+    """
+    rows = [_validar_nueva_incidencia(equipo_id, descripcion, prioridad)
+            for equipo_id, descripcion, prioridad in items]
+    if not rows:
+        return 0
+    return execute_many(conn, _SQL_INSERT_INCIDENCIA, rows)
+
 
 
 def asignar_tecnico(conn: MySQLConnection, incidencia_id: int, tecnico_id: int) -> int:
@@ -102,12 +218,7 @@ def asignar_tecnico(conn: MySQLConnection, incidencia_id: int, tecnico_id: int)
     
     if not isinstance(tecnico_id, int) or tecnico_id <= 0:
         raise ValueError("tecnico_id debe ser un entero positivo")
-    sql = """
-        UPDATE incidencias
-        SET tecnico_id = %s, estado = 'en_proceso'
-        WHERE id = %s AND estado != 'cerrada'
-    """
-    return execute(conn, sql, (tecnico_id, incidencia_id))
+    return execute(conn, _SQL_ASIGNAR_TECNICO, (tecnico_id, incidencia_id))
 
 
 def cerrar_incidencia(conn: MySQLConnection, incidencia_id: int) -> int:
@@ -126,18 +237,70 @@ def cerrar_incidencia(conn: MySQLConnection, incidencia_id: int) -> int:
     """
     if not isinstance(incidencia_id, int) or incidencia_id <= 0:
         raise ValueError("incidencia_id debe ser un entero positivo")
-    sql = """
-        UPDATE incidencias
-        SET estado = 'cerrada', fecha_cierre = NOW()
-        WHERE id = %s AND estado != 'cerrada'
+    return execute(conn, _SQL_CERRAR_INCIDENCIA, (incidencia_id,))
+
+
+
+def cerrar_incidencias(conn: MySQLConnection, ids: Sequence[int]) -> int:
+    """
+    Cierra varias incidencias con un UPDATE por lote en vez de uno por id.
+
+    - Mismas reglas que cerrar_incidencia (solo cierra las no cerradas).
+    - ids debe contener enteros positivos (ValueError).
+    - K ids se agrupan en UPDATEs con WHERE id IN (...), en lotes de
+      _TAM_LOTE: K round-trips pasan a ser ceil(K/_TAM_LOTE).
+
+    Devuelve el total de filas afectadas.
+    """
+    for incidencia_id in ids:
+        if not isinstance(incidencia_id, int) or incidencia_id <= 0:
+            raise ValueError("incidencia_id debe ser un entero positivo")
+
+    total = 0
+    for inicio in range(0, len(ids), _TAM_LOTE):
+        lote = tuple(ids[inicio:inicio + _TAM_LOTE])
+        marcas = ",".join(["%s"] * len(lote))
+        total += execute(conn, _SQL_CERRAR_BULK_TPL.format(marcas=marcas), lote)
+    return total
+
+
+def asignar_tecnico_bulk(conn: MySQLConnection, pairs: Sequence[tuple[int, int]]) -> int:
+    """
+    Asigna técnicos a varias incidencias con un UPDATE por lote.
+
+    - pairs: lista de tuplas (incidencia_id, tecnico_id), todos enteros
+      positivos (ValueError).
+    - Mismas reglas que asignar_tecnico: marca 'en_proceso' y no toca
+      incidencias cerradas.
+    - Usa UPDATE ... SET tecnico_id = CASE id WHEN ... END para resolver
+      todas las asignaciones de un lote en un único round-trip.
+
+    Devuelve el total de filas afectadas.
     """
-    return execute(conn, sql, (incidencia_id,))
+    for incidencia_id, tecnico_id in pairs:
+        if not isinstance(incidencia_id, int) or incidencia_id <= 0:
+            raise ValueError("incidencia_id debe ser un entero positivo")
+        if not isinstance(tecnico_id, int) or tecnico_id <= 0:
+            raise ValueError("tecnico_id debe ser un entero positivo")
 
+    total = 0
+    for inicio in range(0, len(pairs), _TAM_LOTE):
+        lote = pairs[inicio:inicio + _TAM_LOTE]
+        casos = " ".join(["WHEN %s THEN %s"] * len(lote))
+        marcas = ",".join(["%s"] * len(lote))
+        sql = _SQL_ASIGNAR_BULK_TPL.format(casos=casos, marcas=marcas)
+        params: list[int] = []
+        for incidencia_id, tecnico_id in lote:
+            params.extend((incidencia_id, tecnico_id))
+        params.extend(incidencia_id for incidencia_id, _ in lote)
+        total += execute(conn, sql, tuple(params))
+    return total
 
 
-def detalle_incidencias_join(conn: MySQLConnection) -> list[dict]:
+def detalle_incidencias_join(conn: MySQLConnection) -> list[IncidenciaDetalle]:
     """
-    Devuelve una vista enriquecida con datos de equipo y técnico.
+    Devuelve una vista enriquecida con datos de equipo y técnico, como lista
+    de IncidenciaDetalle.
 
     Columnas mínimas esperadas:
     - i.id, i.descripcion, i.prioridad, i.estado, i.fecha_apertura, i.fecha_cierre
@@ -149,22 +312,4 @@ def detalle_incidencias_join(conn: MySQLConnection) -> list[dict]:
     - LEFT JOIN tecnicos (opcional)
     - Ordenar por estado, prioridad DESC, fecha_apertura ASC
     """
-    sql = """
-        SELECT 
-            i.id, i.descripcion, i.prioridad, i.estado, 
-            i.fecha_apertura, i.fecha_cierre,
-            e.tipo, e.modelo, e.ubicacion, e.estado AS estado_equipo,
-            t.nombre AS tecnico
-        FROM incidencias i
-        JOIN equipos e ON i.equipo_id = e.id
-        LEFT JOIN tecnicos t ON i.tecnico_id = t.id
-        ORDER BY 
-            i.estado,
-            CASE i.prioridad
-                WHEN 'alta' THEN 1
-                WHEN 'media' THEN 2
-                WHEN 'baja' THEN 3
-            END,
-            i.fecha_apertura ASC
-    """
-    return fetch_all(conn, sql)
+    return fetch_all_as(conn, _SQL_DETALLE_JOIN, None, IncidenciaDetalle)
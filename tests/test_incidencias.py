@@ -1,9 +1,14 @@
+import mysql.connector
 import pytest
 
-from sti_incidencias.incidencias import (
+from src.db import execute, transaction
+from src.incidencias import (
     asignar_tecnico,
+    asignar_tecnico_bulk,
     cerrar_incidencia,
+    cerrar_incidencias,
     crear_incidencia,
+    crear_incidencias_bulk,
     listar_incidencias_activas,
     listar_incidencias_sin_tecnico,
 )
@@ -76,19 +81,78 @@ def test_asignar_y_cerrar(conn):
     assert n == 1
 
     activas = listar_incidencias_activas(conn)
-    row = next(r for r in activas if r["id"] == inc_id)
-    assert row["tecnico_id"] == tecnico_id
-    assert row["estado"] in {"en_proceso", "abierta"}
+    row = next(r for r in activas if r.id == inc_id)
+    assert row.tecnico_id == tecnico_id
+    assert row.estado in {"en_proceso", "abierta"}
 
     n2 = cerrar_incidencia(conn, inc_id)
     assert n2 == 1
 
     activas2 = listar_incidencias_activas(conn)
-    assert not any(r["id"] == inc_id for r in activas2)
+    assert not any(r.id == inc_id for r in activas2)
 
     _cleanup_test_incidencias(conn)
 
 
+def test_crear_bulk(conn):
+    _cleanup_test_incidencias(conn)
+
+    equipo_id = _get_any_equipo_id(conn)
+    items = [
+        (equipo_id, TEST_DESC, "baja"),
+        (equipo_id, TEST_DESC, "media"),
+        (equipo_id, TEST_DESC, "alta"),
+    ]
+    assert crear_incidencias_bulk(conn, items) == 3
+
+    with pytest.raises(ValueError):
+        crear_incidencias_bulk(conn, [(equipo_id, "   ", "media")])
+
+    _cleanup_test_incidencias(conn)
+
+
+def test_asignar_y_cerrar_bulk(conn):
+    _cleanup_test_incidencias(conn)
+
+    equipo_id = _get_any_equipo_id(conn)
+    tecnico_id = _get_any_tecnico_id(conn)
+
+    assert crear_incidencias_bulk(conn, [(equipo_id, TEST_DESC, "media")] * 3) == 3
+
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM incidencias WHERE descripcion = %s;", (TEST_DESC,))
+    ids = [int(r[0]) for r in cur.fetchall()]
+    cur.close()
+    assert len(ids) == 3
+
+    assert asignar_tecnico_bulk(conn, [(i, tecnico_id) for i in ids]) == 3
+    assert cerrar_incidencias(conn, ids) == 3
+    # Ya cerradas: un segundo cierre no debe afectar filas.
+    assert cerrar_incidencias(conn, ids) == 0
+
+    with pytest.raises(ValueError):
+        cerrar_incidencias(conn, [0])
+
+    _cleanup_test_incidencias(conn)
+
+
+def test_transaction_rollback(conn):
+    _cleanup_test_incidencias(conn)
+
+    equipo_id = _get_any_equipo_id(conn)
+
+    with pytest.raises(mysql.connector.Error):
+        with transaction(conn):
+            crear_incidencia(conn, equipo_id, TEST_DESC, "media")
+            execute(conn, "UPDATE tabla_inexistente SET x = 1")
+
+    # La sentencia fallida debe deshacer también el INSERT anterior del bloque.
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM incidencias WHERE descripcion = %s;", (TEST_DESC,))
+    assert int(cur.fetchone()[0]) == 0
+    cur.close()
+
+
 def test_validaciones(conn):
     equipo_id = _get_any_equipo_id(conn)
 